@@ -3,7 +3,11 @@ from flask_cors import CORS
 import os
 from datetime import datetime
 
-from extensions import db
+from extensions import db, init_db
+from utils.impact import impact_tracker, rebuild_impact_totals
+from utils.admission import admission_metrics
+from utils.compression import init_compression
+from utils.retention import archive_delivered_orders, ensure_order_autoincrement, purge_expired_otps
 
 # Import blueprints
 from routes.auth import auth_bp
@@ -11,19 +15,31 @@ from routes.products import products_bp
 from routes.cart import cart_bp
 from routes.orders import orders_bp
 from routes.analytics import analytics_bp
+from routes.frontend import frontend_bp
 
-def create_app():
+def create_app(config=None):
     app = Flask(__name__)
     
     # Configuration
-    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///ecofinds_v2.db'
+    app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL', 'sqlite:///ecofinds_v2.db')
+    app.config['DATABASE_REPLICA_URL'] = os.environ.get('DATABASE_REPLICA_URL')
+    app.config['DB_READ_ROUTING'] = os.environ.get('DB_READ_ROUTING', '1') != '0'
+    app.config['SQLALCHEMY_BINDS'] = {
+        'archive': os.environ.get('ARCHIVE_DATABASE_URL', 'sqlite:///ecofinds_archive.db')
+    }
+    app.config['ORDER_RETENTION_DAYS'] = int(os.environ.get('ORDER_RETENTION_DAYS', 365))
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
     app.config['JWT_SECRET'] = os.environ.get('JWT_SECRET', 'super-secret-resume-key')
+    app.config['IMPACT_FLUSH_SECONDS'] = float(os.environ.get('IMPACT_FLUSH_SECONDS', 30))
+    app.config['COMPRESS_MIN_BYTES'] = 1024
+    app.config.update(config or {})
     
     CORS(app)
     
     # Initialize extensions
-    db.init_app(app)
+    init_db(app) # primary + read replica engines
+    impact_tracker.init_app(app)
+    init_compression(app)
     
     # Register blueprints
     app.register_blueprint(auth_bp)
@@ -31,6 +47,7 @@ def create_app():
     app.register_blueprint(cart_bp)
     app.register_blueprint(orders_bp)
     app.register_blueprint(analytics_bp)
+    app.register_blueprint(frontend_bp) # catch-all static pages, keep last
     
     @app.route('/health', methods=['GET'])
     def health_check():
@@ -40,17 +57,52 @@ def create_app():
             'timestamp': datetime.utcnow().isoformat()
         }), 200
 
+    @app.route('/health/admission', methods=['GET'])
+    def admission_health():
+        """Queue wait and rejection counters for every admission policy"""
+        return jsonify({'ok': True, 'policies': admission_metrics()}), 200
+
+    @app.cli.command('rebuild-impact')
+    def rebuild_impact():
+        """Recompute ImpactTotals and the leaderboard from all orders (stop the API server first)"""
+        init_schema()
+        buckets = rebuild_impact_totals()
+        print(f"♻️  Rebuilt {buckets} impact buckets from orders")
+
+    @app.cli.command('retention')
+    def retention():
+        """Archive old Delivered orders and purge expired OTPs"""
+        init_schema()
+        archived = archive_delivered_orders(app.config['ORDER_RETENTION_DAYS'])
+        purged = purge_expired_otps()
+        print(f"🗄️  Archived {archived} orders, purged {purged} expired OTPs")
+
     return app
 
+def init_schema():
+    """Create missing tables and indexes on every bind and migrate older SQLite files"""
+    db.create_all()
+    # create_all() skips indexes on tables that already exist
+    for bind_key, metadata in db.metadatas.items():
+        for table in metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(db.engines[bind_key], checkfirst=True)
+    ensure_order_autoincrement()
+
 app = create_app()
 
 if __name__ == '__main__':
     with app.app_context():
-        db.create_all()
+        init_schema()
         # Seed the database
         from utils.seed import seed_database
         seed_database()
         
+        # Backfill impact counters for databases that predate ImpactTotals
+        from models import Order, ImpactTotals
+        if Order.query.first() and not ImpactTotals.query.first():
+            rebuild_impact_totals()
+        
         print("🚀 EcoFinds V2 Backend starting...")
         print("🌐 http://localhost:5000")
         app.run(debug=True, port=5000, host='0.0.0.0')
\ No newline at end of file
@@ -1,3 +1,81 @@
+from functools import wraps
 from flask_sqlalchemy import SQLAlchemy
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
 
-db = SQLAlchemy()
+REPLICA_BIND = 'replica'
+
+class RoutingSession(Session):
+    """Sends reads to the replica engine while the request is marked read-only.
+
+    Flushes always go to the primary, and once a session has flushed it stays
+    on the primary so the request can read its own writes.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        engine = super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+        # Only the default bind has a replica; other binds (e.g. archive) are left alone
+        if bind is None and self.info.get('read_only') and not self._flushing:
+            if engine is self._db.engines.get(None):
+                return self._db.engines.get(REPLICA_BIND, engine)
+        return engine
+
+@event.listens_for(RoutingSession, 'after_flush')
+def _stick_to_primary(session, flush_context):
+    session.info.pop('read_only', None)
+
+db = SQLAlchemy(session_options={'class_': RoutingSession})
+
+def read_only(f):
+    """Route a view's queries to the read replica (if one is configured)"""
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        use_replica()
+        return f(*args, **kwargs)
+    return decorated
+
+def use_replica():
+    """Send the rest of this session's reads to the replica (if one is configured)"""
+    db.session.info['read_only'] = True
+
+def use_primary():
+    """Send the rest of this session's queries to the primary"""
+    db.session.info.pop('read_only', None)
+
+def _is_sqlite_file(url):
+    return url.get_backend_name() == 'sqlite' and url.database not in (None, '', ':memory:')
+
+def init_db(app):
+    """Initialise db with an optional read engine under the 'replica' bind key.
+
+    DATABASE_REPLICA_URL points reads at a real replica. Otherwise SQLite files
+    get a second engine on the same file, opened with query_only so a stray
+    write fails instead of taking the lock. SQLite files run in WAL mode
+    whether or not routing is on, so readers never wait on the writer's lock.
+    """
+    routing = app.config.get('DB_READ_ROUTING', True)
+    if routing:
+        replica_uri = app.config.get('DATABASE_REPLICA_URL') or app.config['SQLALCHEMY_DATABASE_URI']
+        url = make_url(replica_uri)
+        # A second in-memory engine would be a different, empty database
+        if url.get_backend_name() != 'sqlite' or _is_sqlite_file(url):
+            app.config.setdefault('SQLALCHEMY_BINDS', {}).setdefault(REPLICA_BIND, replica_uri)
+
+    db.init_app(app)
+
+    with app.app_context():
+        engines = dict(db.engines)
+    for key, engine in engines.items():
+        if _is_sqlite_file(engine.url):
+            _configure_sqlite(engine, query_only=(key == REPLICA_BIND))
+
+def _configure_sqlite(engine, query_only):
+    @event.listens_for(engine, 'connect')
+    def set_pragmas(dbapi_conn, connection_record):
+        cursor = dbapi_conn.cursor()
+        # journal_mode is stored in the file, so whichever engine connects first sets it
+        cursor.execute('PRAGMA journal_mode=WAL')
+        if query_only:
+            cursor.execute('PRAGMA query_only=ON')
+        cursor.close()
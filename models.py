@@ -106,9 +106,17 @@ class Order(db.Model):
     
     items = db.relationship('OrderItem', backref='order', lazy=True, cascade='all, delete-orphan')
 
+    # Order history is always read per user, newest first
+    __table_args__ = (
+        db.Index('ix_order_user_created', 'user_id', 'created_at'),
+        db.Index('ix_order_status_created', 'status', 'created_at'), # retention scan
+        # Never hand out an id again once retention has moved its order to the archive
+        {'sqlite_autoincrement': True},
+    )
+
 class OrderItem(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    order_id = db.Column(db.Integer, db.ForeignKey('order.id'), nullable=False)
+    order_id = db.Column(db.Integer, db.ForeignKey('order.id'), nullable=False, index=True)
     product_id = db.Column(db.Integer, db.ForeignKey('product.id'), nullable=True)
     product_title = db.Column(db.String(120), nullable=False)
     price_at_purchase = db.Column(db.Float, nullable=False)
@@ -118,4 +126,51 @@ class OTPRecord(db.Model):
     identifier = db.Column(db.String(120), nullable=False)
     otp = db.Column(db.String(6), nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    expires_at = db.Column(db.DateTime, nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+
+class ImpactTotals(db.Model):
+    """Pre-aggregated CO2 impact per (scope, key, day); scope is user, seller or category"""
+    id = db.Column(db.Integer, primary_key=True)
+    scope = db.Column(db.String(20), nullable=False)
+    key = db.Column(db.String(120), nullable=False) # user/seller id or category name
+    day = db.Column(db.Date, nullable=False)
+    co2_saved_kg = db.Column(db.Float, default=0.0, nullable=False)
+    item_count = db.Column(db.Integer, default=0, nullable=False)
+
+    __table_args__ = (
+        db.UniqueConstraint('scope', 'key', 'day', name='uq_impact_scope_key_day'),
+    )
+
+class ArchivedOrder(db.Model):
+    """Delivered orders past the retention window, kept in the separate archive database"""
+    __bind_key__ = 'archive'
+
+    id = db.Column(db.Integer, primary_key=True)
+    source_order_id = db.Column(db.Integer, nullable=False) # the order's id in the hot database
+    user_id = db.Column(db.Integer, nullable=False)
+    total_amount = db.Column(db.Float, nullable=False)
+    total_co2_saved = db.Column(db.Float, default=0.0)
+    status = db.Column(db.String(50), nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False)
+    archived_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    items = db.relationship('ArchivedOrderItem', backref='order', lazy=True)
+
+    __table_args__ = (
+        db.Index('ix_archived_order_user_created', 'user_id', 'created_at'),
+        # Databases from before Order used AUTOINCREMENT may have reused ids, so created_at disambiguates
+        db.UniqueConstraint('source_order_id', 'created_at', name='uq_archived_order_source'),
+    )
+
+class ArchivedOrderItem(db.Model):
+    """Order line with seller/category/CO2 copied in, so analytics never join back to Product"""
+    __bind_key__ = 'archive'
+
+    id = db.Column(db.Integer, primary_key=True)
+    order_id = db.Column(db.Integer, db.ForeignKey('archived_order.id'), nullable=False, index=True)
+    product_id = db.Column(db.Integer, nullable=True)
+    seller_id = db.Column(db.Integer, nullable=True, index=True)
+    category = db.Column(db.String(80), nullable=True)
+    product_title = db.Column(db.String(120), nullable=False)
+    price_at_purchase = db.Column(db.Float, nullable=False)
+    co2_saved_kg = db.Column(db.Float, default=0.0)
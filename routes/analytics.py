@@ -1,15 +1,20 @@
-from flask import Blueprint, jsonify
+from flask import Blueprint, request, jsonify
+from datetime import datetime, timedelta
 from sqlalchemy import func
-from extensions import db
-from models import Order, OrderItem, Product
+from extensions import db, read_only
+from models import Order, OrderItem, Product, User, ImpactTotals, ArchivedOrder, ArchivedOrderItem
 from utils.security import jwt_required
+from utils.impact import impact_tracker
+from utils.admission import AdmissionPolicy
 
 analytics_bp = Blueprint('analytics', __name__, url_prefix='/analytics')
+AdmissionPolicy('analytics', max_concurrent=4, queue_timeout=1.0, rate=5, burst=20).protect(analytics_bp)
 
 @analytics_bp.route('/seller', methods=['GET'])
 @jwt_required
 def seller_dashboard(current_user):
     """Get analytics for the current seller's products (for Chart.js)"""
+    # Stays on the primary: My Listings loads it right after a seller creates a listing
     
     # Total products listed
     total_listings = Product.query.filter_by(owner_id=current_user.id).count()
@@ -30,6 +35,18 @@ def seller_dashboard(current_user):
             sales_by_date[date_str] = 0.0
         sales_by_date[date_str] += item.price_at_purchase
         
+    # Older sales moved to the archive database by retention (seller denormalized there)
+    archived_sales = db.session.query(
+        ArchivedOrderItem.price_at_purchase, ArchivedOrder.created_at
+    ).join(ArchivedOrder, ArchivedOrderItem.order_id == ArchivedOrder.id).filter(
+        ArchivedOrderItem.seller_id == current_user.id
+    ).all()
+    total_sales += len(archived_sales)
+    for price, created_at in archived_sales:
+        total_revenue += price
+        date_str = created_at.strftime('%Y-%m-%d')
+        sales_by_date[date_str] = sales_by_date.get(date_str, 0.0) + price
+        
     dates = sorted(list(sales_by_date.keys()))
     revenues = [sales_by_date[d] for d in dates]
     
@@ -45,3 +62,100 @@ def seller_dashboard(current_user):
             'data': revenues
         }
     }), 200
+
+@analytics_bp.route('/impact', methods=['GET'])
+def platform_impact():
+    """Platform-wide CO2 impact from the pre-aggregated ImpactTotals table"""
+    try:
+        days = min(max(int(request.args.get('days', 30)), 1), 365)
+    except ValueError:
+        return jsonify({'ok': False, 'error': 'days must be an integer'}), 400
+
+    since = datetime.utcnow().date() - timedelta(days=days - 1)
+    # Reads the primary: the table and the unflushed buffer must be seen at the same flush
+    with impact_tracker.pending_snapshot() as pending:
+        # Every order lands in exactly one user bucket, so those sum to the platform total
+        total_co2, total_items = db.session.query(
+            func.sum(ImpactTotals.co2_saved_kg), func.sum(ImpactTotals.item_count)
+        ).filter(ImpactTotals.scope == 'user').one()
+        total_co2, total_items = total_co2 or 0.0, total_items or 0
+
+        daily = dict(db.session.query(
+            ImpactTotals.day, func.sum(ImpactTotals.co2_saved_kg)
+        ).filter(
+            ImpactTotals.scope == 'user', ImpactTotals.day >= since
+        ).group_by(ImpactTotals.day).all())
+
+        by_category = dict(db.session.query(
+            ImpactTotals.key, func.sum(ImpactTotals.co2_saved_kg)
+        ).filter(ImpactTotals.scope == 'category').group_by(ImpactTotals.key).all())
+
+    # Fold in checkouts still buffered in memory instead of flushing from a GET
+    for (scope, key, day), (co2, items) in pending.items():
+        if scope == 'user':
+            total_co2 += co2
+            total_items += items
+            if day >= since:
+                daily[day] = daily.get(day, 0.0) + co2
+        elif scope == 'category':
+            by_category[key] = by_category.get(key, 0.0) + co2
+    days_sorted = sorted(daily)
+
+    return jsonify({
+        'ok': True,
+        'metrics': {
+            'total_co2_saved_kg': round(total_co2, 2),
+            'total_items': total_items
+        },
+        'by_category': {key: round(co2, 2) for key, co2 in by_category.items()},
+        'chart_data': {
+            'labels': [d.isoformat() for d in days_sorted],
+            'data': [round(daily[d], 2) for d in days_sorted]
+        }
+    }), 200
+
+@analytics_bp.route('/impact/me', methods=['GET'])
+@jwt_required
+def my_impact(current_user):
+    """Lifetime CO2 saved by the current user as a buyer and as a seller"""
+    key = str(current_user.id)
+    with impact_tracker.pending_snapshot() as pending:
+        totals = dict(db.session.query(
+            ImpactTotals.scope, func.sum(ImpactTotals.co2_saved_kg)
+        ).filter(
+            ImpactTotals.scope.in_(('user', 'seller')), ImpactTotals.key == key
+        ).group_by(ImpactTotals.scope).all())
+    for (scope, bucket_key, day), (co2, items) in pending.items():
+        if scope in ('user', 'seller') and bucket_key == key:
+            totals[scope] = (totals.get(scope) or 0.0) + co2
+
+    return jsonify({
+        'ok': True,
+        'metrics': {
+            'co2_saved_kg': round(totals.get('user') or 0.0, 2),
+            'co2_saved_as_seller_kg': round(totals.get('seller') or 0.0, 2)
+        }
+    }), 200
+
+@analytics_bp.route('/impact/leaderboard', methods=['GET'])
+@read_only
+def impact_leaderboard():
+    """Top-N users by CO2 saved, served from the in-memory heap"""
+    try:
+        n = min(max(int(request.args.get('n', 10)), 1), 100)
+    except ValueError:
+        return jsonify({'ok': False, 'error': 'n must be an integer'}), 400
+
+    top = impact_tracker.leaderboard(n)
+    users = {u.id: u for u in User.query.filter(User.id.in_([uid for uid, _ in top])).all()}
+
+    results = []
+    for rank, (user_id, co2) in enumerate(top, start=1):
+        user = users.get(user_id)
+        results.append({
+            'rank': rank,
+            'user_id': user_id,
+            'username': (user.username or user.identifier.split('@')[0]) if user else 'Unknown',
+            'co2_saved_kg': round(co2, 2)
+        })
+    return jsonify({'ok': True, 'results': results}), 200
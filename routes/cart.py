@@ -2,6 +2,7 @@ from flask import Blueprint, request, jsonify
 from extensions import db
 from models import CartItem, Product
 from utils.security import jwt_required
+from utils.catalog import hydrate_products
 
 cart_bp = Blueprint('cart', __name__, url_prefix='/cart')
 
@@ -33,19 +34,20 @@ def add_to_cart(current_user):
 @jwt_required
 def get_cart(current_user):
     """Get cart items securely for logged-in user"""
-    cart_items = db.session.query(CartItem, Product).join(
-        Product, CartItem.product_id == Product.id
-    ).filter(CartItem.user_id == current_user.id).order_by(CartItem.added_at.desc()).all()
+    cart_items = CartItem.query.filter_by(user_id=current_user.id).order_by(CartItem.added_at.desc()).all()
+    products = hydrate_products([c.product_id for c in cart_items], ('id', 'title', 'price', 'image_url'))
     
     results = []
-    for cart_item, product in cart_items:
-        primary_img = product.images[0].image_url if product.images else 'https://via.placeholder.com/300x200'
+    for cart_item in cart_items:
+        product = products.get(cart_item.product_id)
+        if not product:
+            continue # listing was removed after it was added to the cart
         results.append({
             'cart_item_id': cart_item.id,
-            'product_id': product.id,
-            'title': product.title,
-            'price': product.price,
-            'image_url': primary_img
+            'product_id': product['id'],
+            'title': product['title'],
+            'price': product['price'],
+            'image_url': product['image_url']
         })
         
     return jsonify({'ok': True, 'results': results}), 200
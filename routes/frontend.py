@@ -0,0 +1,44 @@
+import mimetypes
+import os
+from flask import Blueprint, request, send_file, abort
+from werkzeug.security import safe_join
+from utils.build_frontend import SOURCE_DIR, DIST_DIR, FINGERPRINT_RE
+
+frontend_bp = Blueprint('frontend', __name__)
+
+IMMUTABLE = 'public, max-age=31536000, immutable'
+
+def _frontend_root():
+    # Serve the built bundle when present, otherwise the raw sources (dev mode)
+    return DIST_DIR if os.path.isdir(DIST_DIR) else SOURCE_DIR
+
+@frontend_bp.route('/', methods=['GET'])
+def index():
+    return serve_frontend('index.html')
+
+@frontend_bp.route('/<path:filename>', methods=['GET'])
+def serve_frontend(filename):
+    """Static pages/assets, preferring precompressed .br/.gz siblings"""
+    path = safe_join(_frontend_root(), filename)
+    if path is None or not os.path.isfile(path):
+        abort(404)
+
+    accepted = request.headers.get('Accept-Encoding', '')
+    encoding = None
+    for candidate, suffix in (('br', '.br'), ('gzip', '.gz')):
+        if candidate in accepted and os.path.isfile(path + suffix):
+            encoding, path = candidate, path + suffix
+            break
+
+    mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+    response = send_file(path, mimetype=mimetype, conditional=True, etag=True)
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+
+    # Hashed names change whenever content does; everything else must revalidate
+    if FINGERPRINT_RE.search(filename):
+        response.headers['Cache-Control'] = IMMUTABLE
+    else:
+        response.headers['Cache-Control'] = 'no-cache'
+    return response
@@ -1,7 +1,11 @@
 from flask import Blueprint, request, jsonify
+from datetime import datetime, timedelta
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import selectinload
 from extensions import db
-from models import CartItem, Product, Order, OrderItem, Review
+from models import CartItem, Product, Order, OrderItem, Review, ArchivedOrder, ArchivedOrderItem
 from utils.security import jwt_required
+from utils.impact import impact_tracker
 
 orders_bp = Blueprint('orders', __name__, url_prefix='/orders')
 
@@ -33,6 +37,7 @@ def checkout(current_user):
     db.session.flush() # get ID
     
     # Create Order Items and empty cart
+    impact_lines = []
     for item in cart_items:
         order_item = OrderItem(
             order_id=order.id,
@@ -41,32 +46,114 @@ def checkout(current_user):
             price_at_purchase=item.product.price
         )
         db.session.add(order_item)
+        impact_lines.append((item.product.owner_id, item.product.category, item.product.co2_saved_kg))
         db.session.delete(item) # remove from cart
         
+    order_id = order.id
+    order_day = order.created_at.date()
     db.session.commit()
+    impact_tracker.record_order(current_user.id, order_day, impact_lines)
     
     return jsonify({
         'ok': True, 
-        'order_id': order.id,
+        'order_id': order_id,
         'message': f'Order placed successfully! You saved an estimated {total_co2}kg of CO2!'
     }), 201
 
 @orders_bp.route('/', methods=['GET'])
 @jwt_required
 def get_orders(current_user):
-    """View order history"""
-    orders = Order.query.filter_by(user_id=current_user.id).order_by(Order.created_at.desc()).all()
+    """View order history, newest first, one keyset page at a time"""
+    try:
+        limit = min(max(int(request.args.get('limit', 20)), 1), 100)
+    except ValueError:
+        return jsonify({'ok': False, 'error': 'limit must be an integer'}), 400
+    summary = request.args.get('summary', '').lower() in ('1', 'true', 'yes')
+
+    try:
+        date_from = _parse_date(request.args.get('from'))
+        date_to = _parse_date(request.args.get('to'), end_of_day=True)
+        cursor = _parse_cursor(request.args.get('cursor'))
+    except ValueError as e:
+        return jsonify({'ok': False, 'error': str(e)}), 400
+
+    # Hot and archived orders share a schema shape, so page through both and merge;
+    # each side fetches one extra row to know whether another page exists
+    orders = {}
+    for model in (ArchivedOrder, Order):
+        order_id = _ORDER_ID[model]
+        for o in _order_page(model, current_user.id, date_from, date_to, cursor, limit + 1):
+            # Keyed on created_at too: an id may have been reused before Order used AUTOINCREMENT.
+            # An exact match is the same order, and the hot copy wins if a retention run was interrupted
+            orders[(o.created_at, getattr(o, order_id.key))] = o
+    keys = sorted(orders, reverse=True)
+    has_more = len(keys) > limit
+    keys = keys[:limit]
+
     results = []
-    for o in orders:
-        results.append({
-            'order_id': o.id,
+    for key in keys:
+        o = orders[key]
+        entry = {
+            'order_id': key[1],
             'amount': o.total_amount,
             'co2_saved': o.total_co2_saved,
             'status': o.status,
-            'date': o.created_at.isoformat(),
-            'items': [i.product_title for i in o.items]
-        })
-    return jsonify({'ok': True, 'results': results}), 200
+            'date': o.created_at.isoformat()
+        }
+        if summary:
+            entry['item_count'] = len(o.items)
+            entry['first_item'] = o.items[0].product_title if o.items else None
+        else:
+            entry['items'] = [i.product_title for i in o.items]
+        results.append(entry)
+
+    next_cursor = None
+    if has_more:
+        created_at, order_id = keys[-1]
+        next_cursor = f'{created_at.isoformat()}_{order_id}'
+
+    return jsonify({'ok': True, 'results': results, 'next_cursor': next_cursor}), 200
+
+# Archived orders keep their hot-database id in source_order_id
+_ORDER_ID = {Order: Order.id, ArchivedOrder: ArchivedOrder.source_order_id}
+
+def _order_page(model, user_id, date_from, date_to, cursor, limit):
+    """One keyset page of Order or ArchivedOrder, served by their (user_id, created_at) index"""
+    order_id = _ORDER_ID[model]
+    query = model.query.filter(model.user_id == user_id)
+    if date_from: query = query.filter(model.created_at >= date_from)
+    if date_to: query = query.filter(model.created_at < date_to)
+    if cursor:
+        c_created, c_id = cursor
+        query = query.filter(or_(
+            model.created_at < c_created,
+            and_(model.created_at == c_created, order_id < c_id)
+        ))
+    return query.options(selectinload(model.items)).order_by(
+        model.created_at.desc(), order_id.desc()
+    ).limit(limit).all()
+
+def _parse_date(value, end_of_day=False):
+    """Parse a YYYY-MM-DD or ISO timestamp query arg; bare dates on `to` are inclusive"""
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f'Invalid date: {value}')
+    if end_of_day and len(value) == 10:
+        parsed += timedelta(days=1)
+    return parsed
+
+def _parse_cursor(value):
+    """Cursors are '<created_at iso>_<order id>' as returned in next_cursor"""
+    if not value:
+        return None
+    try:
+        created, order_id = value.rsplit('_', 1)
+        return datetime.fromisoformat(created), int(order_id)
+    except ValueError:
+        raise ValueError('Invalid cursor')
 
 @orders_bp.route('/products/<int:product_id>/review', methods=['POST'])
 @jwt_required
@@ -81,6 +168,9 @@ def add_review(current_user, product_id):
     has_ordered = OrderItem.query.join(Order).filter(
         Order.user_id == current_user.id,
         OrderItem.product_id == product_id
+    ).first() or ArchivedOrderItem.query.join(ArchivedOrder).filter(
+        ArchivedOrder.user_id == current_user.id,
+        ArchivedOrderItem.product_id == product_id
     ).first()
     
     if not has_ordered:
@@ -1,7 +1,9 @@
 from flask import Blueprint, request, jsonify
-from extensions import db
+from extensions import db, read_only, use_replica
 from models import Product, ProductImage
 from utils.security import jwt_required
+from utils.catalog import hydrate_products, parse_fields, parse_ids
+from utils.admission import AdmissionPolicy
 
 products_bp = Blueprint('products', __name__, url_prefix='/products')
 
@@ -60,6 +62,10 @@ def list_products():
     category = request.args.get('category', '').strip()
     seller_id = request.args.get('seller_id')
     
+    # My Listings (seller_id) is read right after creating a listing, so it stays on the primary
+    if not seller_id:
+        use_replica()
+    
     query = Product.query
     
     if q: query = query.filter(Product.title.ilike(f'%{q}%'))
@@ -71,7 +77,35 @@ def list_products():
     products = query.order_by(Product.created_at.desc()).limit(100).all()
     return jsonify({'ok': True, 'results': [p.to_list_dict() for p in products]}), 200
 
+@products_bp.route('/batch', methods=['GET', 'POST'])
+@read_only
+def get_products_batch():
+    """Multi-get products by id; POST {"ids": [...], "fields": [...]} for large id sets"""
+    if request.method == 'POST':
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict):
+            return jsonify({'ok': False, 'error': 'JSON object body required'}), 400
+        raw_ids, raw_fields = data.get('ids'), data.get('fields')
+    else:
+        raw_ids, raw_fields = request.args.get('ids', ''), request.args.get('fields')
+
+    try:
+        ids = parse_ids(raw_ids)
+        fields = parse_fields(raw_fields)
+    except ValueError as e:
+        return jsonify({'ok': False, 'error': str(e)}), 400
+    if not ids:
+        return jsonify({'ok': False, 'error': 'ids required'}), 400
+
+    products = hydrate_products(ids, fields)
+    return jsonify({
+        'ok': True,
+        'results': [products[i] for i in ids if i in products],
+        'missing': [i for i in ids if i not in products]
+    }), 200
+
 @products_bp.route('/<int:product_id>', methods=['GET'])
+@read_only
 def get_product(product_id):
     """Get rich product details (images, reviews)"""
     product = Product.query.get(product_id)
@@ -96,7 +130,12 @@ def get_product(product_id):
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
 
+# TF-IDF is CPU-bound: cap it so product page bursts can't take every worker
+reco_admission = AdmissionPolicy('products.reco', max_concurrent=2, queue_timeout=0.5, rate=2, burst=10)
+
 @products_bp.route('/reco', methods=['GET'])
+@reco_admission
+@read_only
 def get_recommendations_ai():
     product_id = request.args.get('product_id')
     if not product_id: return jsonify({'ok': False, 'error': 'product_id required'}), 400
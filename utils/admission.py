@@ -0,0 +1,150 @@
+import threading
+import time
+from collections import OrderedDict, deque
+from functools import wraps
+from flask import request, jsonify, g
+from utils.security import get_token_user_id
+
+_policies = {}
+
+class TokenBucket:
+    """Per-client token buckets; the least recently seen clients are evicted past max_clients"""
+
+    def __init__(self, rate, burst, max_clients=10000):
+        self.rate = float(rate)
+        self.burst = float(burst)
+        self.max_clients = max_clients
+        self._lock = threading.Lock()
+        self._buckets = OrderedDict()  # key -> [tokens, last_refill]
+
+    def take(self, key):
+        """Return (allowed, retry_after_seconds)"""
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.pop(key, None) or [self.burst, now]
+            bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+            self._buckets[key] = bucket
+            if len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+            if bucket[0] >= 1:
+                bucket[0] -= 1
+                return True, 0.0
+            return False, (1 - bucket[0]) / self.rate
+
+class AdmissionPolicy:
+    """Rate limit + bounded concurrency for expensive routes.
+
+    Requests first spend a token from their client's bucket (429 if empty), then
+    wait up to queue_timeout for one of max_concurrent slots (503 if none frees
+    up), so overload turns into fast rejections instead of a growing backlog.
+    Use as a route decorator or attach to a whole blueprint with protect().
+    """
+
+    def __init__(self, name, max_concurrent=None, queue_timeout=0.5, rate=None, burst=None):
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.queue_timeout = queue_timeout
+        self._slots = threading.BoundedSemaphore(max_concurrent) if max_concurrent else None
+        self._bucket = TokenBucket(rate, burst or rate) if rate else None
+        self._lock = threading.Lock()
+        self._waits = deque(maxlen=1000)  # recent queue waits in ms
+        self.admitted = 0
+        self.rate_limited = 0
+        self.queue_timeouts = 0
+        self.in_flight = 0
+        _policies[name] = self
+
+    def admit(self):
+        """Return None once a slot is held, or the rejection response"""
+        if self._bucket:
+            allowed, retry_after = self._bucket.take(_client_key())
+            if not allowed:
+                with self._lock:
+                    self.rate_limited += 1
+                return _reject(429, 'Too many requests, please slow down.', retry_after)
+
+        if self._slots:
+            start = time.monotonic()
+            acquired = self._slots.acquire(timeout=self.queue_timeout)
+            waited_ms = (time.monotonic() - start) * 1000
+            with self._lock:
+                self._waits.append(waited_ms)
+                if not acquired:
+                    self.queue_timeouts += 1
+            if not acquired:
+                return _reject(503, 'Server is busy, please retry shortly.', 1)
+
+        with self._lock:
+            self.admitted += 1
+            self.in_flight += 1
+        return None
+
+    def release(self):
+        with self._lock:
+            self.in_flight -= 1
+        if self._slots:
+            self._slots.release()
+
+    def __call__(self, f):
+        @wraps(f)
+        def decorated(*args, **kwargs):
+            if request.method == 'OPTIONS':
+                return f(*args, **kwargs)
+            rejection = self.admit()
+            if rejection:
+                return rejection
+            try:
+                return f(*args, **kwargs)
+            finally:
+                self.release()
+        return decorated
+
+    def protect(self, blueprint):
+        """Apply this policy to every route of a blueprint"""
+        flag = f'admission_{self.name}'
+
+        @blueprint.before_request
+        def _admit():
+            if request.method == 'OPTIONS':
+                return None
+            rejection = self.admit()
+            if rejection is None:
+                setattr(g, flag, True)
+            return rejection
+
+        @blueprint.teardown_request
+        def _release(exc):
+            if g.pop(flag, False):
+                self.release()
+
+    def metrics(self):
+        with self._lock:
+            waits = sorted(self._waits)
+            return {
+                'name': self.name,
+                'max_concurrent': self.max_concurrent,
+                'in_flight': self.in_flight,
+                'admitted': self.admitted,
+                'rejected_rate_limit': self.rate_limited,
+                'rejected_queue_timeout': self.queue_timeouts,
+                'queue_wait_ms': {
+                    'p50': round(waits[len(waits) // 2], 2) if waits else 0.0,
+                    'p99': round(waits[max(int(len(waits) * 0.99) - 1, 0)], 2) if waits else 0.0,
+                    'max': round(waits[-1], 2) if waits else 0.0
+                }
+            }
+
+def admission_metrics():
+    return [policy.metrics() for policy in _policies.values()]
+
+def _client_key():
+    # Signed-in users share a bucket across devices; everyone else is keyed by IP
+    user_id = get_token_user_id()
+    return f'user:{user_id}' if user_id else f'ip:{request.remote_addr}'
+
+def _reject(status, message, retry_after):
+    response = jsonify({'ok': False, 'error': message})
+    response.status_code = status
+    response.headers['Retry-After'] = str(max(1, int(retry_after + 0.999)))
+    return response
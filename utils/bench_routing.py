@@ -0,0 +1,88 @@
+"""Read latency under concurrent writes, with and without read/write routing.
+
+    python -m utils.bench_routing [--seconds 5] [--readers 4] [--write-rows 50000]
+
+A writer thread keeps committing large batches of OTP rows while reader
+threads hit the read-only /products/batch endpoint. Both runs use the same
+WAL-mode database, so the difference is only what routing adds: separate
+read and write connection pools, with reads on the query_only replica engine.
+"""
+import argparse
+import os
+import shutil
+import statistics
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+def run(routing, seconds, readers, write_rows):
+    from app import create_app
+    from extensions import db
+    from sqlalchemy import insert
+    from models import OTPRecord
+    from utils.seed import seed_database
+
+    tmp_dir = tempfile.mkdtemp(prefix='ecofinds-bench-')
+    app = create_app({
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{os.path.join(tmp_dir, 'bench.db')}",
+        'DB_READ_ROUTING': routing
+    })
+    with app.app_context():
+        db.create_all(bind_key=None) # the replica bind has no tables of its own
+        seed_database()
+
+    stop = threading.Event()
+    latencies = []
+    writes = [0]
+
+    def writer():
+        # Large bulk commits keep SQLite's write lock busy without holding the GIL
+        rows = [{'identifier': f'bench{i}@ecofinds.com', 'otp': '000000',
+                 'created_at': datetime.utcnow(), 'expires_at': datetime.utcnow()} for i in range(write_rows)]
+        with app.app_context():
+            while not stop.is_set():
+                db.session.execute(insert(OTPRecord), rows)
+                db.session.commit()
+                writes[0] += 1
+
+    def reader():
+        client = app.test_client()
+        samples = []
+        while not stop.is_set():
+            start = time.perf_counter()
+            client.get('/products/batch?ids=1,2,3,4,5')
+            samples.append((time.perf_counter() - start) * 1000)
+        latencies.extend(samples)
+
+    threads = [threading.Thread(target=writer)] + [threading.Thread(target=reader) for _ in range(readers)]
+    for t in threads: t.start()
+    time.sleep(seconds)
+    stop.set()
+    for t in threads: t.join()
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    latencies.sort()
+    return {
+        'reads': len(latencies),
+        'write_batches': writes[0],
+        'p50_ms': statistics.median(latencies),
+        'p99_ms': latencies[int(len(latencies) * 0.99) - 1],
+        'max_ms': latencies[-1]
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--seconds', type=float, default=5.0)
+    parser.add_argument('--readers', type=int, default=4)
+    parser.add_argument('--write-rows', type=int, default=50000)
+    args = parser.parse_args()
+
+    for routing in (False, True):
+        r = run(routing, args.seconds, args.readers, args.write_rows)
+        label = 'routed (WAL)       ' if routing else 'single engine (WAL)'
+        print(f"{label}  reads={r['reads']:<6} write_batches={r['write_batches']:<5} "
+              f"p50={r['p50_ms']:.1f}ms p99={r['p99_ms']:.1f}ms max={r['max_ms']:.1f}ms")
+
+if __name__ == '__main__':
+    main()
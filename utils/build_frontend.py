@@ -0,0 +1,87 @@
+"""Build frontend/dist: content-hashed, precompressed static assets.
+
+    python -m utils.build_frontend
+
+CSS/JS files are renamed to name.<hash>.ext so they can be cached forever,
+HTML pages are rewritten to point at the hashed names, and every text file
+gets .gz (and .br when the optional `brotli` package is installed) siblings
+that the Flask frontend blueprint serves as-is.
+"""
+import gzip
+import hashlib
+import json
+import os
+import re
+import shutil
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SOURCE_DIR = os.path.join(BASE_DIR, 'frontend')
+DIST_DIR = os.path.join(SOURCE_DIR, 'dist')
+
+FINGERPRINT_RE = re.compile(r'\.[0-9a-f]{12}\.\w+$')
+HASHED_EXTENSIONS = ('.css', '.js')
+COMPRESSED_EXTENSIONS = ('.html', '.css', '.js', '.json', '.svg')
+
+def _fingerprint(rel_path, data):
+    digest = hashlib.sha256(data).hexdigest()[:12]
+    root, ext = os.path.splitext(rel_path)
+    return f'{root}.{digest}{ext}'
+
+def _write(rel_path, data):
+    path = os.path.join(DIST_DIR, rel_path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as fh:
+        fh.write(data)
+    if rel_path.endswith(COMPRESSED_EXTENSIONS):
+        # mtime=0 keeps the .gz bytes (and so its ETag) stable across builds
+        with open(path + '.gz', 'wb') as fh:
+            fh.write(gzip.compress(data, compresslevel=9, mtime=0))
+        if brotli:
+            with open(path + '.br', 'wb') as fh:
+                fh.write(brotli.compress(data))
+
+def build():
+    shutil.rmtree(DIST_DIR, ignore_errors=True)
+
+    sources = []
+    for root, dirs, files in os.walk(SOURCE_DIR):
+        dirs[:] = [d for d in dirs if os.path.join(root, d) != DIST_DIR]
+        for name in files:
+            rel_path = os.path.relpath(os.path.join(root, name), SOURCE_DIR).replace(os.sep, '/')
+            sources.append(rel_path)
+
+    manifest = {}
+    for rel_path in sources:
+        if rel_path.endswith(HASHED_EXTENSIONS):
+            with open(os.path.join(SOURCE_DIR, rel_path), 'rb') as fh:
+                data = fh.read()
+            manifest[rel_path] = _fingerprint(rel_path, data)
+            _write(manifest[rel_path], data)
+
+    ref_re = re.compile(
+        r'''((?:src|href)=["'])(%s)(["'])''' % '|'.join(re.escape(p) for p in manifest)
+    ) if manifest else None
+
+    for rel_path in sources:
+        if rel_path in manifest:
+            continue
+        with open(os.path.join(SOURCE_DIR, rel_path), 'rb') as fh:
+            data = fh.read()
+        if rel_path.endswith('.html') and ref_re:
+            html = ref_re.sub(lambda m: m.group(1) + manifest[m.group(2)] + m.group(3), data.decode('utf-8'))
+            data = html.encode('utf-8')
+        _write(rel_path, data)
+
+    with open(os.path.join(DIST_DIR, 'manifest.json'), 'w') as fh:
+        json.dump(manifest, fh, indent=2, sort_keys=True)
+    return manifest
+
+if __name__ == '__main__':
+    manifest = build()
+    print(f"📦 Built frontend/dist with {len(manifest)} fingerprinted assets"
+          f"{'' if brotli else ' (install brotli for .br files)'}")
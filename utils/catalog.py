@@ -0,0 +1,106 @@
+from sqlalchemy import func
+from sqlalchemy.orm import load_only
+from extensions import db
+from models import Product, ProductImage, Review, User
+
+MAX_BATCH_IDS = 500
+PLACEHOLDER_IMAGE = 'https://via.placeholder.com/300x200?text=EcoFinds'
+
+COLUMN_FIELDS = ('id', 'owner_id', 'title', 'description', 'category', 'price', 'co2_saved_kg', 'created_at')
+DERIVED_FIELDS = ('owner_name', 'image_url', 'images', 'average_rating', 'review_count')
+DEFAULT_FIELDS = ('id', 'owner_id', 'title', 'category', 'price', 'image_url') # same shape as to_list_dict
+
+def parse_fields(raw):
+    """Accept a comma string or list of field names; raises ValueError on unknown ones"""
+    if not raw:
+        return list(DEFAULT_FIELDS)
+    if not isinstance(raw, (str, list)):
+        raise ValueError('fields must be a comma-separated string or a list')
+    names = raw.split(',') if isinstance(raw, str) else raw
+    fields = []
+    for name in names:
+        name = str(name).strip()
+        if not name or name in fields:
+            continue
+        if name not in COLUMN_FIELDS and name not in DERIVED_FIELDS:
+            raise ValueError(f'Unknown field: {name}')
+        fields.append(name)
+    return fields or list(DEFAULT_FIELDS)
+
+def parse_ids(raw):
+    """Accept a comma string or list of ids; de-duplicates while keeping order"""
+    if raw is not None and not isinstance(raw, (str, list)):
+        raise ValueError('ids must be a comma-separated string or a list')
+    values = raw.split(',') if isinstance(raw, str) else (raw or [])
+    ids = []
+    seen = set()
+    for value in values:
+        if str(value).strip() == '':
+            continue
+        try:
+            product_id = int(str(value).strip())
+        except ValueError:
+            raise ValueError(f'Invalid product id: {value}')
+        if product_id not in seen:
+            seen.add(product_id)
+            ids.append(product_id)
+    if len(ids) > MAX_BATCH_IDS:
+        raise ValueError(f'At most {MAX_BATCH_IDS} ids per request')
+    return ids
+
+def hydrate_products(ids, fields=DEFAULT_FIELDS):
+    """Load the requested fields for many products in at most four queries.
+
+    Returns {product_id: dict}; ids that don't exist are simply absent.
+    """
+    if not ids:
+        return {}
+
+    columns = {f for f in fields if f in COLUMN_FIELDS} | {'id'}
+    if 'owner_name' in fields:
+        columns.add('owner_id')
+    products = Product.query.options(
+        load_only(*[getattr(Product, c) for c in columns])
+    ).filter(Product.id.in_(ids)).all()
+    found = [p.id for p in products]
+
+    images = {}
+    if 'image_url' in fields or 'images' in fields:
+        rows = db.session.query(ProductImage.product_id, ProductImage.image_url).filter(
+            ProductImage.product_id.in_(found)
+        ).order_by(ProductImage.id).all()
+        for product_id, url in rows:
+            images.setdefault(product_id, []).append(url)
+
+    owners = {}
+    if 'owner_name' in fields:
+        owner_ids = {p.owner_id for p in products}
+        owners = dict(db.session.query(User.id, User.username).filter(User.id.in_(owner_ids)).all())
+
+    ratings = {}
+    if 'average_rating' in fields or 'review_count' in fields:
+        rows = db.session.query(
+            Review.product_id, func.avg(Review.rating), func.count(Review.id)
+        ).filter(Review.product_id.in_(found)).group_by(Review.product_id).all()
+        ratings = {product_id: (avg, count) for product_id, avg, count in rows}
+
+    results = {}
+    for p in products:
+        entry = {}
+        for field in fields:
+            if field == 'created_at':
+                entry[field] = p.created_at.isoformat()
+            elif field in COLUMN_FIELDS:
+                entry[field] = getattr(p, field)
+            elif field == 'owner_name':
+                entry[field] = owners.get(p.owner_id) or 'Unknown'
+            elif field == 'image_url':
+                entry[field] = images[p.id][0] if p.id in images else PLACEHOLDER_IMAGE
+            elif field == 'images':
+                entry[field] = images.get(p.id, [])
+            elif field == 'average_rating':
+                entry[field] = round(ratings.get(p.id, (0, 0))[0] or 0, 1)
+            elif field == 'review_count':
+                entry[field] = ratings.get(p.id, (0, 0))[1]
+        results[p.id] = entry
+    return results
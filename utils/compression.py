@@ -0,0 +1,23 @@
+import gzip
+from flask import request
+
+def init_compression(app):
+    """Gzip JSON responses larger than COMPRESS_MIN_BYTES when the client accepts it"""
+    min_bytes = app.config.get('COMPRESS_MIN_BYTES', 1024)
+    level = app.config.get('COMPRESS_LEVEL', 6)
+
+    @app.after_request
+    def compress_json(response):
+        if (response.mimetype != 'application/json' or response.direct_passthrough
+                or 'Content-Encoding' in response.headers
+                or 'gzip' not in request.headers.get('Accept-Encoding', '')):
+            return response
+
+        response.vary.add('Accept-Encoding')
+        data = response.get_data()
+        if len(data) < min_bytes:
+            return response
+
+        response.set_data(gzip.compress(data, compresslevel=level))
+        response.headers['Content-Encoding'] = 'gzip'
+        return response
@@ -0,0 +1,298 @@
+import atexit
+import heapq
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from flask import current_app
+from sqlalchemy import func, tuple_
+from sqlalchemy.exc import SQLAlchemyError
+from extensions import db, use_primary
+from models import ImpactTotals, Order, OrderItem, Product, ArchivedOrder, ArchivedOrderItem
+
+class ImpactLeaderboard:
+    """Indexed max-heap of user CO2 totals: O(log n) per update, O(k log k) for top-k"""
+
+    def __init__(self):
+        self._heap = []  # [total, user_id], largest total at index 0
+        self._pos = {}   # user_id -> index in _heap
+
+    def __len__(self):
+        return len(self._heap)
+
+    def add(self, user_id, delta):
+        i = self._pos.get(user_id)
+        if i is None:
+            self._heap.append([0.0, user_id])
+            i = self._pos[user_id] = len(self._heap) - 1
+        self._heap[i][0] += delta
+        if delta >= 0:
+            self._sift_up(i)
+        else:
+            self._sift_down(i)
+
+    def top(self, n):
+        """Walk the heap best-first with a frontier heap instead of sorting everything"""
+        results = []
+        frontier = [(-self._heap[0][0], 0)] if self._heap else []
+        while frontier and len(results) < n:
+            neg_total, i = heapq.heappop(frontier)
+            results.append((self._heap[i][1], -neg_total))
+            for child in (2 * i + 1, 2 * i + 2):
+                if child < len(self._heap):
+                    heapq.heappush(frontier, (-self._heap[child][0], child))
+        return results
+
+    def _swap(self, i, j):
+        heap = self._heap
+        heap[i], heap[j] = heap[j], heap[i]
+        self._pos[heap[i][1]] = i
+        self._pos[heap[j][1]] = j
+
+    def _sift_up(self, i):
+        while i > 0:
+            parent = (i - 1) // 2
+            if self._heap[parent][0] >= self._heap[i][0]:
+                break
+            self._swap(i, parent)
+            i = parent
+
+    def _sift_down(self, i):
+        size = len(self._heap)
+        while True:
+            largest = i
+            for child in (2 * i + 1, 2 * i + 2):
+                if child < size and self._heap[child][0] > self._heap[largest][0]:
+                    largest = child
+            if largest == i:
+                break
+            self._swap(i, largest)
+            i = largest
+
+class ImpactTracker:
+    """Buffers checkout impact in memory and flushes it to ImpactTotals in batches.
+
+    A daemon thread flushes every flush_interval seconds (and once more at
+    interpreter exit); checkout only flushes inline when the buffer is full.
+    After each flush the same thread reloads the leaderboard from the table,
+    so each worker process also picks up the checkouts other workers flushed
+    and any `flask rebuild-impact` run.
+    """
+
+    def __init__(self):
+        self.flush_interval = 30.0
+        self.max_pending = 500
+        self._lock = threading.Lock()        # guards _pending and _leaderboard
+        self._flush_lock = threading.Lock()  # serialises flushes and leaderboard loads
+        self._pending = {}  # (scope, key, day) -> [co2_saved_kg, item_count]
+        self._leaderboard = None  # loaded lazily from ImpactTotals
+        self._flusher = None
+
+    def init_app(self, app):
+        self.flush_interval = app.config.get('IMPACT_FLUSH_SECONDS', self.flush_interval)
+        self.max_pending = app.config.get('IMPACT_MAX_PENDING', self.max_pending)
+        app.extensions['impact'] = self
+
+    def record_order(self, user_id, day, lines):
+        """Count a placed order; lines are (seller_id, category, co2_saved_kg) per item"""
+        self._ensure_flusher()
+        with self._lock:
+            total_co2 = 0.0
+            for seller_id, category, co2 in lines:
+                self._bump(('seller', str(seller_id), day), co2)
+                self._bump(('category', category, day), co2)
+                total_co2 += co2
+            bucket = self._pending.setdefault(('user', str(user_id), day), [0.0, 0])
+            bucket[0] += total_co2
+            bucket[1] += len(lines)
+            if self._leaderboard is not None:
+                self._leaderboard.add(user_id, total_co2)
+            full = len(self._pending) >= self.max_pending
+
+        if full:
+            try:
+                self.flush()
+            except SQLAlchemyError as e:
+                # Counts stay buffered; the next flush retries them
+                print(f"[impact] flush failed, will retry: {e}")
+
+    def _bump(self, bucket_key, co2):
+        bucket = self._pending.setdefault(bucket_key, [0.0, 0])
+        bucket[0] += co2
+        bucket[1] += 1
+
+    @contextmanager
+    def pending_snapshot(self):
+        """Yield a copy of the unflushed buckets; run the ImpactTotals reads inside the block.
+
+        Holding the flush lock means no flush is between swapping its buckets
+        out and committing them, so each bucket is in the table or in the
+        snapshot, never neither or both.
+        """
+        with self._flush_lock:
+            use_primary() # a lagging replica might not have the last flush yet
+            with self._lock:
+                snapshot = {bucket_key: tuple(values) for bucket_key, values in self._pending.items()}
+            yield snapshot
+
+    def flush(self):
+        """Write buffered counters with one SELECT and one commit"""
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+            if not pending:
+                return 0
+
+            use_primary() # the existing-row lookup must not see a lagging replica
+            try:
+                existing = ImpactTotals.query.filter(
+                    tuple_(ImpactTotals.scope, ImpactTotals.key, ImpactTotals.day).in_(list(pending))
+                ).all()
+                rows = {(r.scope, r.key, r.day): r for r in existing}
+                for bucket_key, (co2, items) in pending.items():
+                    row = rows.get(bucket_key)
+                    if row is None:
+                        scope, key, day = bucket_key
+                        db.session.add(ImpactTotals(scope=scope, key=key, day=day,
+                                                    co2_saved_kg=co2, item_count=items))
+                    else:
+                        row.co2_saved_kg += co2
+                        row.item_count += items
+                db.session.commit()
+            except SQLAlchemyError:
+                db.session.rollback()
+                with self._lock:
+                    for bucket_key, (co2, items) in pending.items():
+                        bucket = self._pending.setdefault(bucket_key, [0.0, 0])
+                        bucket[0] += co2
+                        bucket[1] += items
+                raise
+            return len(pending)
+
+    def leaderboard(self, n):
+        """Top-n users by CO2 saved as (user_id, co2_saved_kg)"""
+        self._ensure_flusher()
+        if self._leaderboard is None:
+            self.reload_leaderboard()
+        with self._lock:
+            return self._leaderboard.top(n)
+
+    def reload_leaderboard(self):
+        """Rebuild the heap from ImpactTotals plus the unflushed buffer, without writing"""
+        with self._flush_lock: # no flush can move buckets from _pending to the table meanwhile
+            use_primary()
+            totals = db.session.query(
+                ImpactTotals.key, func.sum(ImpactTotals.co2_saved_kg)
+            ).filter(ImpactTotals.scope == 'user').group_by(ImpactTotals.key).all()
+            board = ImpactLeaderboard()
+            for key, co2 in totals:
+                board.add(int(key), co2 or 0.0)
+            with self._lock:
+                for (scope, key, day), (co2, items) in self._pending.items():
+                    if scope == 'user':
+                        board.add(int(key), co2)
+                self._leaderboard = board
+
+    def _ensure_flusher(self):
+        if self._flusher is not None:
+            return
+        app = current_app._get_current_object()
+        with self._lock:
+            if self._flusher is not None:
+                return
+            self._flusher = threading.Thread(target=self._run_flusher, args=(app,),
+                                             name='impact-flusher', daemon=True)
+        self._flusher.start()
+        atexit.register(self._flush_at_exit, app)
+
+    def _run_flusher(self, app):
+        while True:
+            time.sleep(self.flush_interval)
+            with app.app_context():
+                try:
+                    self.flush()
+                    # Other workers flush into the same table; one GROUP BY catches up with them
+                    if self._leaderboard is not None:
+                        self.reload_leaderboard()
+                except SQLAlchemyError as e:
+                    print(f"[impact] background flush failed, will retry: {e}")
+
+    def _flush_at_exit(self, app):
+        with app.app_context():
+            try:
+                self.flush()
+            except SQLAlchemyError as e:
+                print(f"[impact] final flush failed, {len(self._pending)} buckets lost: {e}")
+
+impact_tracker = ImpactTracker()
+
+def _as_date(value):
+    # func.date() gives a string on SQLite and a date elsewhere
+    return datetime.strptime(value, '%Y-%m-%d').date() if isinstance(value, str) else value
+
+def rebuild_impact_totals():
+    """Recompute ImpactTotals from hot and archived orders and reload the leaderboard.
+
+    Run it with the API server stopped: a running server's unflushed buffer
+    holds orders this rebuild also counts, so they would be added twice once
+    it flushes. A running server reloads its leaderboard from the rebuilt
+    table within one flush interval.
+    """
+    impact_tracker.flush()
+    totals = {}
+
+    def add(bucket_key, co2, items):
+        bucket = totals.setdefault(bucket_key, [0.0, 0])
+        bucket[0] += co2 or 0.0
+        bucket[1] += items
+
+    order_day = func.date(Order.created_at)
+    for user_id, day, co2 in db.session.query(
+        Order.user_id, order_day, func.sum(Order.total_co2_saved)
+    ).group_by(Order.user_id, order_day):
+        add(('user', str(user_id), _as_date(day)), co2, 0)
+
+    for user_id, day, items in db.session.query(
+        Order.user_id, order_day, func.count(OrderItem.id)
+    ).join(OrderItem, OrderItem.order_id == Order.id).group_by(Order.user_id, order_day):
+        add(('user', str(user_id), _as_date(day)), 0.0, items)
+
+    # Items whose product was deleted can no longer be attributed to a seller or category
+    for column, scope in ((Product.owner_id, 'seller'), (Product.category, 'category')):
+        for key, day, co2, items in db.session.query(
+            column, order_day, func.sum(Product.co2_saved_kg), func.count(OrderItem.id)
+        ).select_from(OrderItem).join(Order, OrderItem.order_id == Order.id).join(
+            Product, OrderItem.product_id == Product.id
+        ).group_by(column, order_day):
+            add((scope, str(key), _as_date(day)), co2, items)
+
+    # Archived orders carry their own seller/category/CO2 copies
+    archived_day = func.date(ArchivedOrder.created_at)
+    for user_id, day, co2 in db.session.query(
+        ArchivedOrder.user_id, archived_day, func.sum(ArchivedOrder.total_co2_saved)
+    ).group_by(ArchivedOrder.user_id, archived_day):
+        add(('user', str(user_id), _as_date(day)), co2, 0)
+
+    for user_id, day, items in db.session.query(
+        ArchivedOrder.user_id, archived_day, func.count(ArchivedOrderItem.id)
+    ).join(ArchivedOrderItem, ArchivedOrderItem.order_id == ArchivedOrder.id).group_by(
+        ArchivedOrder.user_id, archived_day
+    ):
+        add(('user', str(user_id), _as_date(day)), 0.0, items)
+
+    for column, scope in ((ArchivedOrderItem.seller_id, 'seller'), (ArchivedOrderItem.category, 'category')):
+        for key, day, co2, items in db.session.query(
+            column, archived_day, func.sum(ArchivedOrderItem.co2_saved_kg), func.count(ArchivedOrderItem.id)
+        ).join(ArchivedOrder, ArchivedOrderItem.order_id == ArchivedOrder.id).filter(
+            column.isnot(None)
+        ).group_by(column, archived_day):
+            add((scope, str(key), _as_date(day)), co2, items)
+
+    ImpactTotals.query.delete()
+    db.session.add_all(
+        ImpactTotals(scope=scope, key=key, day=day, co2_saved_kg=co2, item_count=items)
+        for (scope, key, day), (co2, items) in totals.items()
+    )
+    db.session.commit()
+    impact_tracker.reload_leaderboard()
+    return len(totals)
@@ -0,0 +1,142 @@
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import func
+from sqlalchemy.orm import selectinload
+from sqlalchemy.schema import CreateIndex, CreateTable
+from extensions import db, use_primary
+from models import Order, OrderItem, Product, OTPRecord, ArchivedOrder, ArchivedOrderItem
+
+def archive_delivered_orders(retention_days, batch_size=500, pause=0.05):
+    """Move Delivered orders older than retention_days to the archive database.
+
+    Works in batches so each hot-database write transaction stays short. The
+    archive commit happens before the hot delete, and orders already archived
+    under the same (id, created_at) are skipped, so an interrupted run can
+    simply be re-run.
+    """
+    use_primary()
+    ensure_order_autoincrement()
+    cutoff = datetime.utcnow() - timedelta(days=retention_days)
+    archived = 0
+    while True:
+        orders = Order.query.options(selectinload(Order.items)).filter(
+            Order.status == 'Delivered', Order.created_at < cutoff
+        ).order_by(Order.id).limit(batch_size).all()
+        if not orders:
+            break
+
+        order_ids = [o.id for o in orders]
+        product_ids = {i.product_id for o in orders for i in o.items if i.product_id}
+        products = {p.id: p for p in Product.query.filter(Product.id.in_(product_ids)).all()}
+        # An id alone isn't proof: pre-AUTOINCREMENT databases may have reused it
+        already = {(row.source_order_id, row.created_at) for row in ArchivedOrder.query.filter(
+            ArchivedOrder.source_order_id.in_(order_ids)
+        ).all()}
+
+        for o in orders:
+            if (o.id, o.created_at) in already:
+                continue
+            archived += 1
+            archived_order = ArchivedOrder(
+                source_order_id=o.id, user_id=o.user_id, total_amount=o.total_amount,
+                total_co2_saved=o.total_co2_saved, status=o.status, created_at=o.created_at
+            )
+            db.session.add(archived_order)
+            db.session.flush() # get archive ID
+            for item in o.items:
+                product = products.get(item.product_id)
+                db.session.add(ArchivedOrderItem(
+                    order_id=archived_order.id,
+                    product_id=item.product_id,
+                    seller_id=product.owner_id if product else None,
+                    category=product.category if product else None,
+                    product_title=item.product_title,
+                    price_at_purchase=item.price_at_purchase,
+                    co2_saved_kg=product.co2_saved_kg if product else 0.0
+                ))
+        db.session.commit() # archive database only
+
+        OrderItem.query.filter(OrderItem.order_id.in_(order_ids)).delete(synchronize_session=False)
+        Order.query.filter(Order.id.in_(order_ids)).delete(synchronize_session=False)
+        db.session.commit()
+        db.session.expunge_all()
+
+        if len(orders) < batch_size:
+            break
+        time.sleep(pause) # let queued writers in between batches
+    return archived
+
+def purge_expired_otps(batch_size=1000, pause=0.05):
+    """Delete expired OTPs a bounded batch at a time via the expires_at index"""
+    use_primary()
+    now = datetime.utcnow()
+    purged = 0
+    while True:
+        ids = [row.id for row in db.session.query(OTPRecord.id).filter(
+            OTPRecord.expires_at < now
+        ).limit(batch_size).all()]
+        if not ids:
+            break
+        OTPRecord.query.filter(OTPRecord.id.in_(ids)).delete(synchronize_session=False)
+        db.session.commit()
+        purged += len(ids)
+        if len(ids) < batch_size:
+            break
+        time.sleep(pause)
+    return purged
+
+def ensure_order_autoincrement():
+    """Give an existing SQLite `order` table AUTOINCREMENT and keep its sequence above archived ids.
+
+    Without AUTOINCREMENT SQLite reuses the highest ids once retention deletes
+    them, so a new checkout could take the id of an archived order. SQLite
+    can't ALTER that in place, so the table is rebuilt in one transaction.
+    """
+    engine = db.engines[None]
+    if engine.url.get_backend_name() != 'sqlite':
+        return False
+    floor = db.session.query(func.max(ArchivedOrder.source_order_id)).scalar() or 0
+    table = Order.__table__
+
+    raw = engine.raw_connection()
+    try:
+        conn = raw.driver_connection
+        isolation_level, conn.isolation_level = conn.isolation_level, None # we issue BEGIN/COMMIT
+        cursor = conn.cursor()
+        cursor.execute('BEGIN IMMEDIATE')
+        try:
+            row = cursor.execute(
+                "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (table.name,)
+            ).fetchone()
+            migrated = row is not None and 'AUTOINCREMENT' not in row[0].upper()
+            if migrated:
+                columns = ', '.join(f'"{r[1]}"' for r in cursor.execute(f'PRAGMA table_info("{table.name}")'))
+                # legacy mode keeps order_item's REFERENCES "order" pointing at the new table
+                cursor.execute('PRAGMA legacy_alter_table = ON')
+                cursor.execute(f'ALTER TABLE "{table.name}" RENAME TO "{table.name}_old"')
+                cursor.execute(str(CreateTable(table).compile(engine)))
+                cursor.execute(f'INSERT INTO "{table.name}" ({columns}) SELECT {columns} FROM "{table.name}_old"')
+                cursor.execute(f'DROP TABLE "{table.name}_old"')
+                cursor.execute('PRAGMA legacy_alter_table = OFF')
+                for index in table.indexes:
+                    cursor.execute(str(CreateIndex(index).compile(engine)))
+
+            if row is not None:
+                current = cursor.execute(
+                    'SELECT MAX(seq) FROM sqlite_sequence WHERE name = ?', (table.name,)
+                ).fetchone()[0]
+                hot_max = cursor.execute(f'SELECT MAX(id) FROM "{table.name}"').fetchone()[0] or 0
+                target = max(floor, hot_max)
+                if current is None:
+                    cursor.execute('INSERT INTO sqlite_sequence (name, seq) VALUES (?, ?)', (table.name, target))
+                elif current < target:
+                    cursor.execute('UPDATE sqlite_sequence SET seq = ? WHERE name = ?', (target, table.name))
+            cursor.execute('COMMIT')
+        except Exception:
+            cursor.execute('ROLLBACK')
+            raise
+        finally:
+            conn.isolation_level = isolation_level
+    finally:
+        raw.close()
+    return migrated
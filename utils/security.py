@@ -9,14 +9,27 @@ def generate_token(user_id):
     }
     return jwt.encode(payload, current_app.config['JWT_SECRET'], algorithm='HS256')
 
+def _get_bearer_token():
+    if 'Authorization' in request.headers:
+        parts = request.headers['Authorization'].split()
+        if len(parts) == 2 and parts[0] == 'Bearer':
+            return parts[1]
+    return None
+
+def get_token_user_id():
+    """User id from a valid bearer token without hitting the database, else None"""
+    token = _get_bearer_token()
+    if not token:
+        return None
+    try:
+        return jwt.decode(token, current_app.config['JWT_SECRET'], algorithms=['HS256']).get('user_id')
+    except jwt.InvalidTokenError:
+        return None
+
 def jwt_required(f):
     @wraps(f)
     def decorated(*args, **kwargs):
-        token = None
-        if 'Authorization' in request.headers:
-            parts = request.headers['Authorization'].split()
-            if len(parts) == 2 and parts[0] == 'Bearer':
-                token = parts[1]
+        token = _get_bearer_token()
                 
         if not token:
             return jsonify({'ok': False, 'error': 'Authentication token is missing. Please log in.'}), 401